@@ -6,10 +6,12 @@ from threading import Thread, Event
 from typing import Optional
 
 from config.config_manager import ConfigManager
+from storage.manager import StorageManager
 
 class CameraRecorder:
-    def __init__(self):
+    def __init__(self, storage_manager: Optional[StorageManager] = None):
         self.config = ConfigManager()
+        self.storage_manager = storage_manager or StorageManager()
         self.recording_thread: Optional[Thread] = None
         self.stop_event = Event()
         
@@ -84,6 +86,9 @@ class CameraRecorder:
 
                 out.release()
 
+                # Register the finished segment for retention
+                self.storage_manager.add_file(output_path)
+
                 # Check if we need to stop
                 if time.time() - start_time >= self.recording_duration:
                     self.check_storage_limit()
@@ -92,17 +97,5 @@ class CameraRecorder:
             cap.release()
 
     def check_storage_limit(self) -> None:
-        """Check storage limit and delete oldest files if necessary."""
-        max_size = self.config.storage_config["max_storage_size"]
-        current_size = sum(f.stat().st_size for f in self.recordings_dir.glob("*.mp4"))
-
-        if current_size > max_size:
-            files = sorted(
-                self.recordings_dir.glob("*.mp4"),
-                key=lambda x: x.stat().st_mtime
-            )
-            
-            while current_size > max_size and files:
-                oldest_file = files.pop(0)
-                current_size -= oldest_file.stat().st_size
-                oldest_file.unlink()
\ No newline at end of file
+        """Enforce the recordings quota through the storage manager."""
+        self.storage_manager.cleanup_directory(self.recordings_dir)
@@ -5,16 +5,20 @@ from pathlib import Path
 from camera.recorder import CameraRecorder
 from processor.video_processor import VideoProcessor
 from storage.manager import StorageManager
+from storage.archiver import ArchiveTranscoder
 from config.config_manager import ConfigManager
-from webui.app import start_webui, camera_recorder
+from webui.app import start_webui, camera_recorder, storage_manager
 
 class MainController:
     def __init__(self):
         self.config = ConfigManager()
         # Use the shared camera_recorder instance from app.py
         self.camera_recorder = camera_recorder
-        self.video_processor = VideoProcessor()
-        self.storage_manager = StorageManager()
+        # Share the web UI's storage manager so every new, moved or deleted
+        # video reaches the same retention heap
+        self.storage_manager = storage_manager
+        self.video_processor = VideoProcessor(storage_manager=self.storage_manager)
+        self.archive_transcoder = ArchiveTranscoder(storage_manager=self.storage_manager)
 
         self.processing_thread = None
         self.stop_processing = threading.Event()
@@ -44,6 +48,9 @@ class MainController:
             self.processing_thread.start()
             print("Video processing started")
 
+            # Start background archiving of aged cat videos
+            self.archive_transcoder.start()
+
             # Start web UI
             print("Starting web UI...")
             start_webui()
@@ -68,6 +75,10 @@ class MainController:
             self.processing_thread.join()
         print("Video processing stopped")
 
+        # Stop background archiving
+        self.archive_transcoder.stop()
+        print("Video archiving stopped")
+
 if __name__ == "__main__":
     # Create necessary directories
     for dir_name in ["recordings", "cat_videos", "models"]:
@@ -15,14 +15,14 @@ class ModelFactory:
         return YOLO(model_path)
 
 class VideoProcessor:
-    def __init__(self):
+    def __init__(self, storage_manager: Optional[StorageManager] = None):
         self.config = ConfigManager()
         self.model = ModelFactory.create_model(self.config.model_config["path"])
         self.frame_interval = self.config.processing_config["frame_interval"]
         self.cat_detection_threshold = self.config.processing_config["cat_detection_threshold"]
         self.confidence_threshold = self.config.processing_config["confidence_threshold"]
         self.cat_class_id = self.config.model_config["cat_class_id"]
-        self.storage_manager = StorageManager()
+        self.storage_manager = storage_manager or StorageManager()
 
         # Initialize paths
         self.recordings_dir = Path(self.config.storage_config["recordings_dir"])
@@ -99,13 +99,15 @@ class VideoProcessor:
         # Detect objects in frames
         detection_results = self.detect_objects(frames)
 
-        # Count frames with cats
+        # Count frames with cats and collect the best confidence per frame
         cat_frames = 0
+        cat_confidences = []
         for frame_detections in detection_results:
-            for class_id, confidence in frame_detections:
-                if class_id == self.cat_class_id:
-                    cat_frames += 1
-                    break
+            cat_scores = [confidence for class_id, confidence in frame_detections
+                          if class_id == self.cat_class_id]
+            if cat_scores:
+                cat_frames += 1
+                cat_confidences.append(max(cat_scores))
 
         # Calculate cat detection ratio
         cat_ratio = cat_frames / len(frames)
@@ -115,10 +117,20 @@ class VideoProcessor:
             # Move to cat videos directory
             new_path = self.cat_videos_dir / video_path.name
             video_path.rename(new_path)
+            self.storage_manager.remove_file(video_path)
+
+            # Let the retention strategy rank this video against the others
+            fps = self.config.camera_config["fps"]
+            self.storage_manager.add_file(
+                new_path,
+                confidence=sum(cat_confidences) / len(cat_confidences) if cat_confidences else 0.0,
+                cat_duration=cat_frames * self.frame_interval / fps
+            )
             return True
         else:
             # Delete video
             video_path.unlink()
+            self.storage_manager.remove_file(video_path)
             return False
 
     def process_new_videos(self) -> None:
@@ -0,0 +1,62 @@
+import argparse
+
+import cv2
+
+# This module is started as a separate process by storage.archiver and must
+# only depend on OpenCV, so the worker never loads the model, camera or web UI.
+
+def transcode(src: str, dst: str, width: int, height: int, fps: float) -> None:
+    """Re-encode src into dst at the archive resolution and frame rate.
+
+    Priority and CPU budget are enforced by the parent process.
+    """
+    cv2.setNumThreads(1)
+
+    # Also limit the FFmpeg decoder threads where OpenCV supports it
+    if hasattr(cv2, "CAP_PROP_N_THREADS"):
+        cap = cv2.VideoCapture(src, cv2.CAP_ANY, [cv2.CAP_PROP_N_THREADS, 1])
+    else:
+        cap = cv2.VideoCapture(src)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video: {src}")
+
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    step = max(1, round(src_fps / fps))
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(dst, fourcc, src_fps / step, (width, height))
+
+    try:
+        frame_count = 0
+        while True:
+            # Skipped frames are only grabbed, not decoded into images
+            if frame_count % step != 0:
+                if not cap.grab():
+                    break
+                frame_count += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            out.write(cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA))
+            frame_count += 1
+    finally:
+        cap.release()
+        out.release()
+
+def main() -> None:
+    """Command-line entry point: python -m storage.archive_worker SRC DST ..."""
+    parser = argparse.ArgumentParser(description="Re-encode a video to the archive tier")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--width", type=int, required=True)
+    parser.add_argument("--height", type=int, required=True)
+    parser.add_argument("--fps", type=float, required=True)
+    args = parser.parse_args()
+
+    transcode(args.src, args.dst, args.width, args.height, args.fps)
+
+if __name__ == "__main__":
+    main()
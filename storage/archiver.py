@@ -0,0 +1,245 @@
+import os
+import sys
+import time
+import shutil
+import subprocess
+from pathlib import Path
+from threading import Thread, Event
+from typing import List, Optional, Set, Tuple
+
+import cv2
+import psutil
+
+from config.config_manager import ConfigManager
+from storage.manager import StorageManager
+
+class ArchiveTranscoder:
+    """Background job that shrinks aged cat videos into an archive tier."""
+
+    def __init__(self, storage_manager: Optional[StorageManager] = None):
+        self.config = ConfigManager()
+        self.storage_manager = storage_manager or StorageManager()
+        self.archive_thread: Optional[Thread] = None
+        self.stop_event = Event()
+
+        archive_config = self.config.storage_config.get("archive", {})
+        self.enabled = archive_config.get("enabled", False)
+        self.min_age = archive_config.get("min_age_days", 3) * 86400
+        self.width = archive_config.get("resolution", {}).get("width", 640)
+        self.height = archive_config.get("resolution", {}).get("height", 360)
+        self.fps = archive_config.get("fps", 10)
+        self.bitrate = archive_config.get("bitrate", "500k")
+        self.ffmpeg_path = archive_config.get("ffmpeg_path", "ffmpeg")
+        self.cpu_budget = archive_config.get("cpu_budget", 0.25)
+        self.nice = archive_config.get("nice", 19)
+        self.max_load = archive_config.get("max_load", 0.5)
+        self.check_interval = archive_config.get("check_interval", 300)
+
+        # Initialize paths
+        self.cat_videos_dir = self.storage_manager.cat_videos_dir
+        self.tmp_dir = self.cat_videos_dir / "archive_tmp"
+
+        # Videos already archived or checked, so they are not re-probed
+        self._archived: Set[Path] = set()
+
+    def start(self) -> None:
+        """Start the archive job in a separate thread."""
+        if not self.enabled:
+            return
+        if self.archive_thread and self.archive_thread.is_alive():
+            return
+
+        self.clear_tmp_dir()
+        self.stop_event.clear()
+        self.archive_thread = Thread(target=self._archive_loop, daemon=True)
+        self.archive_thread.start()
+
+    def clear_tmp_dir(self) -> None:
+        """Delete partial encodes left behind by an interrupted run."""
+        if not self.tmp_dir.exists():
+            return
+        for tmp_path in self.tmp_dir.iterdir():
+            try:
+                tmp_path.unlink()
+            except OSError as e:
+                print(f"Failed to delete archive temp file {tmp_path}: {e}")
+
+    def stop(self) -> None:
+        """Stop the archive thread, abandoning any transcode in progress."""
+        if self.archive_thread and self.archive_thread.is_alive():
+            self.stop_event.set()
+            self.archive_thread.join()
+
+    def _archive_loop(self) -> None:
+        """Archive aged videos whenever the system is idle."""
+        while not self.stop_event.wait(self.check_interval):
+            try:
+                self.archive_aged_videos()
+            except Exception as e:
+                print(f"Error in video archiving: {e}")
+
+    def is_idle(self) -> bool:
+        """Check whether overall CPU usage leaves room for archiving."""
+        return psutil.cpu_percent(interval=1) / 100 <= self.max_load
+
+    def find_aged_videos(self) -> List[Path]:
+        """List cat videos old enough to archive, oldest first."""
+        cutoff = time.time() - self.min_age
+        videos = []
+        for file_path in self.cat_videos_dir.glob("*.mp4"):
+            if file_path in self._archived:
+                continue
+            try:
+                mtime = file_path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if mtime <= cutoff:
+                videos.append((mtime, file_path))
+        videos.sort()
+        return [file_path for _, file_path in videos]
+
+    def archive_aged_videos(self) -> int:
+        """Transcode aged cat videos one at a time while the system is idle."""
+        self._archived = {p for p in self._archived if p.exists()}
+
+        archived = 0
+        for video_path in self.find_aged_videos():
+            if self.stop_event.is_set() or not self.is_idle():
+                break
+            target_size = self.get_target_size(video_path)
+            if target_size and self.transcode(video_path, target_size):
+                archived += 1
+            self._archived.add(video_path)
+        return archived
+
+    def get_target_size(self, video_path: Path) -> Optional[Tuple[int, int]]:
+        """Get the archive frame size for a video, keeping its aspect ratio.
+
+        Returns None if the video already fits within the archive
+        resolution or cannot be read.
+        """
+        cap = cv2.VideoCapture(str(video_path))
+        try:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        finally:
+            cap.release()
+
+        if width <= 0 or height <= 0:
+            return None
+        if width <= self.width and height <= self.height:
+            return None
+
+        # Scale to fit the archive box; encoders need even dimensions
+        scale = min(self.width / width, self.height / height)
+        return (max(2, int(width * scale) // 2 * 2),
+                max(2, int(height * scale) // 2 * 2))
+
+    def _encode_command(self, video_path: Path, tmp_path: Path,
+                        target_size: Tuple[int, int]) -> List[str]:
+        """Build the encoder command line.
+
+        Uses ffmpeg when it is installed, since it can target a bitrate;
+        otherwise falls back to the OpenCV worker, which can only lower
+        resolution and frame rate. Neither imports the rest of the app.
+        """
+        # The worker runs from the project root, so pass absolute paths
+        video_path = video_path.resolve()
+        tmp_path = tmp_path.resolve()
+        width, height = target_size
+
+        ffmpeg = shutil.which(self.ffmpeg_path)
+        if ffmpeg:
+            return [
+                ffmpeg, "-y", "-loglevel", "error",
+                "-threads", "1", "-i", str(video_path),
+                "-vf", f"scale={width}:{height}",
+                "-r", str(self.fps),
+                "-c:v", "mpeg4", "-b:v", str(self.bitrate),
+                "-an", "-threads", "1", "-filter_threads", "1",
+                str(tmp_path)
+            ]
+        return [
+            sys.executable, "-m", "storage.archive_worker",
+            str(video_path), str(tmp_path),
+            "--width", str(width), "--height", str(height),
+            "--fps", str(self.fps)
+        ]
+
+    def _priority_options(self) -> dict:
+        """Popen options that start the encoder below capture and inference."""
+        if psutil.WINDOWS:
+            return {"creationflags": subprocess.IDLE_PRIORITY_CLASS}
+        return {"preexec_fn": lambda: os.nice(self.nice)}
+
+    def _wait_throttled(self, process: subprocess.Popen) -> None:
+        """Wait for the encoder, suspending it to stay within cpu_budget.
+
+        CPU time is measured for the whole process, so this also covers
+        threads started inside the decoder or encoder. The encoder is
+        always terminated and reaped, even if throttling fails.
+        """
+        try:
+            child = psutil.Process(process.pid)
+            wall_start = time.monotonic()
+
+            while process.poll() is None:
+                if self.stop_event.wait(1):
+                    break
+
+                cpu_times = child.cpu_times()
+                cpu_used = cpu_times.user + cpu_times.system
+                delay = cpu_used / self.cpu_budget - (time.monotonic() - wall_start)
+                if delay > 0:
+                    child.suspend()
+                    try:
+                        self.stop_event.wait(delay)
+                    finally:
+                        child.resume()
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.Error as e:
+            print(f"Failed to throttle archive encoder, stopping it: {e}")
+        finally:
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
+
+    def transcode(self, video_path: Path, target_size: Tuple[int, int]) -> bool:
+        """Replace a video with its archive-tier encoding.
+
+        The original is kept if transcoding fails, is interrupted, or
+        does not make the file smaller.
+        """
+        self.tmp_dir.mkdir(exist_ok=True)
+        tmp_path = self.tmp_dir / video_path.name
+
+        process = subprocess.Popen(
+            self._encode_command(video_path, tmp_path, target_size),
+            cwd=Path(__file__).resolve().parent.parent,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **self._priority_options()
+        )
+        self._wait_throttled(process)
+
+        try:
+            if process.returncode != 0 or not tmp_path.exists():
+                return False
+
+            stat = video_path.stat()
+            if tmp_path.stat().st_size >= stat.st_size:
+                return False
+
+            # Keep the original timestamp so age-based ordering is unchanged
+            os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+
+            # Only swap in the archive copy if retention has not deleted the
+            # original meanwhile
+            return self.storage_manager.replace_file(video_path, tmp_path)
+        except OSError:
+            # The original was deleted by retention or is in use
+            return False
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
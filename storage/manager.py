@@ -1,14 +1,55 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, List, Optional, Set
 from config.config_manager import ConfigManager
 import numpy as np
 
+def _metadata_path(file_path: Path) -> Path:
+    """Get the JSON sidecar that stores a video's detection metadata."""
+    return file_path.with_suffix(".json")
+
+def _load_metadata(file_path: Path) -> Dict[str, Any]:
+    """Load a video's detection metadata, or {} if it has none."""
+    try:
+        with open(_metadata_path(file_path), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_metadata(file_path: Path, metadata: Dict[str, Any]) -> None:
+    """Save a video's detection metadata next to it."""
+    with open(_metadata_path(file_path), "w") as f:
+        json.dump(metadata, f)
+
 class StorageStrategy(ABC):
     @abstractmethod
     def cleanup(self, directory: Path, max_size: int) -> None:
         pass
 
+    def add_file(self, file_path: Path, **metadata: Any) -> None:
+        """Notify the strategy that a file has arrived. Ignored by default."""
+        pass
+
+    def remove_file(self, file_path: Path) -> None:
+        """Notify the strategy that a file was moved or deleted. Ignored by default."""
+        pass
+
+    def replace_file(self, file_path: Path, new_path: Path) -> bool:
+        """Replace file_path with new_path, unless file_path has been deleted."""
+        if not file_path.exists():
+            return False
+        try:
+            os.replace(new_path, file_path)
+        except OSError:
+            return False
+        return True
+
 class OldestFirstStrategy(StorageStrategy):
     def cleanup(self, directory: Path, max_size: int) -> None:
         """Delete oldest files first until total size is under max_size."""
@@ -31,10 +72,227 @@ class OldestFirstStrategy(StorageStrategy):
             file_path.unlink()
             total_size -= file_size
 
+class HeapStrategy(StorageStrategy):
+    """Evict files from a per-directory min-heap ordered by priority().
+
+    The directory is scanned once, on its first cleanup. After that the
+    heap is only updated through add_file() and remove_file() as videos
+    are finished, moved or deleted, so cleanup never rescans the
+    directory. Heap entries for removed files are dropped lazily.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        # max_age in seconds; files older than this are evicted regardless of size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._heaps: Dict[Path, list] = {}
+        self._age_heaps: Dict[Path, list] = {}
+        self._sizes: Dict[Path, Dict[Path, int]] = {}
+        self._totals: Dict[Path, int] = {}
+        # Sequence number of each file's live heap entry; older entries are stale
+        self._seqs: Dict[Path, int] = {}
+        self._metadata: Dict[Path, Dict[str, Any]] = {}
+        self._seeded: Set[Path] = set()
+
+    @abstractmethod
+    def priority(self, file_path: Path, mtime: float, metadata: Dict[str, Any]) -> Any:
+        """Return the heap key for a file. Lowest keys are evicted first."""
+        pass
+
+    def add_file(self, file_path: Path, **metadata: Any) -> None:
+        """Push a newly arrived or rewritten file onto its directory's heap.
+
+        Calling this again without metadata (e.g. after a file is re-encoded)
+        refreshes its size and keeps the metadata it was first added with.
+        """
+        if not file_path.exists():
+            return
+        with self._lock:
+            self._track(file_path.parent, file_path, metadata)
+
+    def remove_file(self, file_path: Path) -> None:
+        """Stop tracking a file that was moved or deleted elsewhere."""
+        with self._lock:
+            self._forget(file_path.parent, file_path)
+
+    def replace_file(self, file_path: Path, new_path: Path) -> bool:
+        """Swap in a rewritten file and refresh its size.
+
+        Holds the lock so a file evicted in the meantime is not brought back.
+        """
+        with self._lock:
+            directory = file_path.parent
+            if directory in self._seeded and file_path not in self._sizes[directory]:
+                return False
+            if not super().replace_file(file_path, new_path):
+                return False
+            self._track(directory, file_path, {})
+            return True
+
+    def cleanup(self, directory: Path, max_size: int) -> None:
+        """Evict expired files, then lowest-priority files until under max_size."""
+        if not directory.exists():
+            return
+
+        with self._lock:
+            if directory not in self._seeded:
+                self._seed(directory)
+            self._compact(directory)
+            heap = self._heaps[directory]
+
+            # Files that could not be deleted (e.g. open elsewhere on Windows)
+            # go back on the heap for the next pass
+            deferred = []
+            deferred_age = []
+
+            if self.max_age is not None:
+                cutoff = time.time() - self.max_age
+                age_heap = self._age_heaps[directory]
+                while age_heap and age_heap[0][0] < cutoff:
+                    entry = heapq.heappop(age_heap)
+                    if self._seqs.get(entry[2]) == entry[1]:
+                        if not self._evict(directory, entry[2]):
+                            deferred_age.append(entry)
+
+            while self._totals[directory] > max_size and heap:
+                entry = heapq.heappop(heap)
+                if self._seqs.get(entry[2]) == entry[1]:
+                    if not self._evict(directory, entry[2]):
+                        deferred.append(entry)
+
+            for entry in deferred:
+                heapq.heappush(heap, entry)
+            for entry in deferred_age:
+                heapq.heappush(self._age_heaps[directory], entry)
+
+    def _track(self, directory: Path, file_path: Path, metadata: Dict[str, Any],
+               stat: Optional[os.stat_result] = None) -> None:
+        """Record a file in the accounting tables. Caller holds the lock."""
+        sizes = self._sizes.setdefault(directory, {})
+        heap = self._heaps.setdefault(directory, [])
+        age_heap = self._age_heaps.setdefault(directory, [])
+        self._totals.setdefault(directory, 0)
+
+        if stat is None:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                return
+
+        if not metadata:
+            metadata = self._metadata.get(file_path) or _load_metadata(file_path)
+        self._metadata[file_path] = metadata
+
+        if file_path in sizes:
+            self._totals[directory] -= sizes[file_path]
+        sizes[file_path] = stat.st_size
+        self._totals[directory] += stat.st_size
+
+        seq = next(self._counter)
+        self._seqs[file_path] = seq
+        heapq.heappush(heap, (self.priority(file_path, stat.st_mtime, metadata), seq, file_path))
+        if self.max_age is not None:
+            heapq.heappush(age_heap, (stat.st_mtime, seq, file_path))
+
+    def _seed(self, directory: Path) -> None:
+        """Track the files already on disk. Scans the directory only once."""
+        self._seeded.add(directory)
+        self._sizes.setdefault(directory, {})
+        self._heaps.setdefault(directory, [])
+        self._age_heaps.setdefault(directory, [])
+        self._totals.setdefault(directory, 0)
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".mp4"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                self._track(directory, directory / entry.name, {}, stat)
+
+    def _forget(self, directory: Path, file_path: Path) -> None:
+        """Drop a file from the accounting; its heap entries become stale."""
+        sizes = self._sizes.get(directory, {})
+        if file_path in sizes:
+            self._totals[directory] -= sizes.pop(file_path)
+        self._seqs.pop(file_path, None)
+        self._metadata.pop(file_path, None)
+
+    def _compact(self, directory: Path) -> None:
+        """Rebuild heaps once stale entries dominate, to bound memory."""
+        heap = self._heaps[directory]
+        if len(heap) > 2 * len(self._sizes[directory]) + 64:
+            self._heaps[directory] = [e for e in heap if self._seqs.get(e[2]) == e[1]]
+            heapq.heapify(self._heaps[directory])
+            age_heap = self._age_heaps[directory]
+            self._age_heaps[directory] = [e for e in age_heap if self._seqs.get(e[2]) == e[1]]
+            heapq.heapify(self._age_heaps[directory])
+
+    def _evict(self, directory: Path, file_path: Path) -> bool:
+        """Delete a tracked file and update the running total.
+
+        Returns False, leaving the accounting untouched, if the file is in
+        use and cannot be deleted yet.
+        """
+        try:
+            file_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+
+        self._forget(directory, file_path)
+        _metadata_path(file_path).unlink(missing_ok=True)
+        return True
+
+class AgeRetentionStrategy(HeapStrategy):
+    """Evict oldest files first, and anything older than max_age."""
+
+    def priority(self, file_path: Path, mtime: float, metadata: Dict[str, Any]) -> Any:
+        return mtime
+
+class PriorityStrategy(HeapStrategy):
+    """Evict the least interesting cat videos first.
+
+    A video's score is its mean detection confidence times the number of
+    seconds a cat was on screen; ties fall back to oldest first. Metadata
+    is read back from each video's JSON sidecar after a restart; files
+    without one score zero.
+    """
+
+    def priority(self, file_path: Path, mtime: float, metadata: Dict[str, Any]) -> Any:
+        confidence = metadata.get("confidence", 0.0)
+        cat_duration = metadata.get("cat_duration", 0.0)
+        return (confidence * cat_duration, mtime)
+
+class TieredStrategy(StorageStrategy):
+    """Dispatch each directory to its own strategy."""
+
+    def __init__(self, strategies: Dict[Path, StorageStrategy], default: StorageStrategy = None):
+        self.strategies = {Path(d): s for d, s in strategies.items()}
+        self.default = default or OldestFirstStrategy()
+
+    def _strategy_for(self, directory: Path) -> StorageStrategy:
+        return self.strategies.get(Path(directory), self.default)
+
+    def cleanup(self, directory: Path, max_size: int) -> None:
+        self._strategy_for(directory).cleanup(directory, max_size)
+
+    def add_file(self, file_path: Path, **metadata: Any) -> None:
+        self._strategy_for(file_path.parent).add_file(file_path, **metadata)
+
+    def remove_file(self, file_path: Path) -> None:
+        self._strategy_for(file_path.parent).remove_file(file_path)
+
+    def replace_file(self, file_path: Path, new_path: Path) -> bool:
+        return self._strategy_for(file_path.parent).replace_file(file_path, new_path)
+
 class StorageManager:
     def __init__(self, strategy: StorageStrategy = None):
         self.config = ConfigManager()
-        self.strategy = strategy or OldestFirstStrategy()
         
         # Initialize paths
         self.recordings_dir = Path(self.config.storage_config["recordings_dir"])
@@ -48,21 +306,67 @@ class StorageManager:
         self.models_dir.mkdir(exist_ok=True)
         self.cat_images_dir.mkdir(exist_ok=True)
 
+        self.strategy = strategy or self._create_strategy()
+
+    def _create_strategy(self) -> StorageStrategy:
+        """Build the default per-tier strategy from the retention settings."""
+        retention = self.config.storage_config.get("retention", {})
+
+        def max_age(key: str) -> Optional[float]:
+            days = retention.get(key)
+            return days * 86400 if days else None
+
+        return TieredStrategy({
+            self.recordings_dir: AgeRetentionStrategy(max_age("recordings_max_age_days")),
+            self.cat_videos_dir: PriorityStrategy(max_age("cat_videos_max_age_days")),
+        })
+
+    def get_max_size(self, directory: Path) -> int:
+        """Get the storage quota for a directory, falling back to max_storage_size."""
+        quotas = self.config.storage_config.get("quotas", {})
+        if Path(directory) == self.recordings_dir:
+            quota = quotas.get("recordings")
+        elif Path(directory) == self.cat_videos_dir:
+            quota = quotas.get("cat_videos")
+        else:
+            quota = None
+        return quota or self.config.storage_config["max_storage_size"]
+
+    def add_file(self, file_path: Path, **metadata: Any) -> None:
+        """Register a newly stored video (and its detection metadata) for retention."""
+        if metadata:
+            _save_metadata(file_path, metadata)
+        self.strategy.add_file(file_path, **metadata)
+
+    def remove_file(self, file_path: Path) -> None:
+        """Unregister a video that was moved or deleted outside of retention."""
+        self.strategy.remove_file(file_path)
+
+    def replace_file(self, file_path: Path, new_path: Path) -> bool:
+        """Replace a stored video with a rewritten copy (e.g. an archive encode).
+
+        Returns False if the original was deleted in the meantime, in which
+        case new_path is left for the caller to discard.
+        """
+        return self.strategy.replace_file(file_path, new_path)
+
     def get_total_size(self, directory: Path) -> int:
         """Get total size of MP4 files in directory."""
         if not directory.exists():
             return 0
         return sum(f.stat().st_size for f in directory.glob("*.mp4"))
 
+    def cleanup_directory(self, directory: Path) -> None:
+        """Enforce the storage quota of a single directory."""
+        self.strategy.cleanup(directory, self.get_max_size(directory))
+
     def check_and_cleanup(self) -> None:
         """Check storage limits and clean up if necessary."""
-        max_size = self.config.storage_config["max_storage_size"]
-        
         # Clean up recordings directory
-        self.strategy.cleanup(self.recordings_dir, max_size)
+        self.cleanup_directory(self.recordings_dir)
         
         # Clean up cat videos directory
-        self.strategy.cleanup(self.cat_videos_dir, max_size)
+        self.cleanup_directory(self.cat_videos_dir)
 
     def list_recordings(self) -> List[dict]:
         """List all recordings with their metadata."""
@@ -23,8 +23,8 @@ def _jinja2_filter_datetime(timestamp, fmt=None):
     return datetime.fromtimestamp(timestamp).strftime(fmt)
 
 # Create shared instances
-camera_recorder = CameraRecorder()
-video_processor = VideoProcessor()
+camera_recorder = CameraRecorder(storage_manager=storage_manager)
+video_processor = VideoProcessor(storage_manager=storage_manager)
 
 # Global variables to store system status
 system_status: Dict[str, Any] = {